@@ -1,44 +1,80 @@
+import base64
+import binascii
+import csv
 import os
-import glob
+import sys
 
-try:
-    import readline
-except ImportError:
-    import pyreadline as readline  # Use pyreadline3 on Windows
+if sys.stdout.isatty():
+    from colorama import Fore, Style
+else:
+    class _NoColour:
+        """Stand-in for colorama's Fore/Style that renders every colour as an empty string."""
 
-from colorama import Fore, Style
+        def __getattr__(self, name):
+            return ""
+
+    # Keep piped output free of ANSI escape codes
+    Fore = Style = _NoColour()
+
+# LDIF attribute names and objectClass values are case-insensitive, so
+# lookups are done on lowercased keys.
+USER_OBJECT_CLASSES = frozenset(["inetorgperson", "posixaccount"])
+GROUP_OBJECT_CLASSES = frozenset(["groupofnames", "posixgroup", "groupofmembers"])
+COMMON_MEMBERSHIP_ATTRIBUTES = {
+    attr.lower(): attr for attr in ["member", "memberUid", "uniqueMember", "isMemberOf", "memberOf"]
+}
 
 
 class LDIFConsole:
     def __init__(self):
-        self.ldif_content = None
+        self.entries = []
+        self.dn_index = {}
         self.membership_attributes = ["member", "memberUid"]
         self.nodes = []
         self.edges = []
-        self.commands = [
-            "help",
-            "load",
-            "set_attrs",
-            "parse",
-            "view_nodes",
-            "view_edges",
-            "view_group",
-            "export",
-            "exit"
-        ]
+        # Row templates for view_nodes/view_edges, built once with the colour codes baked in
+        self._node_tmpl = "  " + Fore.BLUE + "%s: %s (%s)" + Style.RESET_ALL
+        self._edge_tmpl = "  " + Fore.BLUE + "%s: %s -> %s" + Style.RESET_ALL
+        # Each handler takes the raw argument string (or None); a truthy return exits the console
+        self.dispatch = {
+            "help": lambda args: self.help(),
+            "load": self.load_ldif,
+            "set_attrs": self.set_membership_attributes,
+            "parse": lambda args: self.parse(),
+            "view_nodes": lambda args: self.view_nodes(),
+            "view_edges": lambda args: self.view_edges(),
+            "view_group": self.view_group_command,
+            "export": self.export_command,
+            "exit": self.exit_command,
+        }
+        self.commands = list(self.dispatch)
         self.setup_tab_completion()
 
     def setup_tab_completion(self):
         """Setup tab completion for commands and file paths."""
+        if not sys.stdin.isatty():
+            return  # No line editing when input is piped
+
+        try:
+            import readline
+        except ImportError:
+            import pyreadline as readline  # Use pyreadline3 on Windows
+
+        # readline calls the completer once per candidate with increasing
+        # state; list the directory once per TAB press (state 0) and serve
+        # the remaining candidates from that listing.
+        path_cache = {"matches": []}
+
         def completer(text, state):
             buffer = readline.get_line_buffer().strip()
             tokens = buffer.split()
 
             # If "load" command is being typed, complete file paths
             if buffer.startswith("load"):
-                partial_path = buffer[5:].strip()  # Get the file path portion
-                matches = glob.glob(partial_path + "*")  # Find matching files/directories
-                matches = [m + ("/" if os.path.isdir(m) else "") for m in matches]  # Add "/" to directories
+                if state == 0:
+                    partial_path = buffer[5:].strip()  # Get the file path portion
+                    path_cache["matches"] = complete_path(partial_path)
+                matches = path_cache["matches"]
                 if state < len(matches):
                     return matches[state]
                 return None
@@ -60,8 +96,9 @@ class LDIFConsole:
             return
 
         try:
-            with open(file_path, 'r') as file:
-                self.ldif_content = file.read()
+            with open(file_path, 'r', buffering=1 << 20) as file:
+                self.entries = read_ldif_entries(file)
+            self.dn_index = {entry["dn"]: entry for entry in self.entries}
             print(f"{Fore.GREEN}LDIF file '{file_path}' loaded successfully.{Style.RESET_ALL}")
 
             # Auto-detect membership attributes
@@ -106,45 +143,32 @@ class LDIFConsole:
 
     def detect_membership_attributes(self):
         """Automatically detect likely membership attributes in the LDIF content."""
-        if not self.ldif_content:
+        if not self.entries:
             return []
 
-        common_attributes = ["member", "memberUid", "uniqueMember", "isMemberOf", "memberOf"]
         detected_attributes = set()
 
-        for line in self.ldif_content.splitlines():
-            line = line.strip()
-            if ":" in line:
-                attribute = line.split(":", 1)[0]
-                if attribute in common_attributes:
-                    detected_attributes.add(attribute)
+        for entry in self.entries:
+            for key, _, _ in entry["attrs"]:
+                common_attr = COMMON_MEMBERSHIP_ATTRIBUTES.get(key)
+                if common_attr:
+                    detected_attributes.add(common_attr)
 
         return list(detected_attributes)
 
     def get_group_entries(self, membership_attributes):
         """Get group entries containing the detected membership attributes."""
         group_entries = []
-        current_entry = []
-        current_dn = None
-        members = []
-        inside_group = False
-
-        for line in self.ldif_content.splitlines():
-            line = line.strip()
-            if line.startswith("dn:"):
-                if inside_group:
-                    group_entries.append({"dn": current_dn, "members": members})
-                current_entry = [line]
-                current_dn = line.split(":", 1)[1].strip()
-                members = []
-                inside_group = False
-            elif any(line.startswith(f"{attr}:") for attr in membership_attributes):
-                inside_group = True
-                members.append(line.split(":", 1)[1].strip())
-            current_entry.append(line)
-
-        if inside_group:
-            group_entries.append({"dn": current_dn, "members": members})
+        membership_attributes = frozenset(attr.strip().lower() for attr in membership_attributes)
+
+        for entry in self.entries:
+            members = None  # Only allocated once the entry turns out to be a group
+            for key, _, value in entry["attrs"]:
+                if key in membership_attributes:
+                    if members is None:
+                        members = []
+                        group_entries.append({"dn": entry["dn"], "members": members})
+                    members.append(value)
 
         return group_entries
 
@@ -158,11 +182,11 @@ class LDIFConsole:
         print(f"{Fore.GREEN}Membership attributes set to: {', '.join(self.membership_attributes)}{Style.RESET_ALL}")
 
     def parse(self):
-        if not self.ldif_content:
+        if not self.entries:
             print(f"{Fore.RED}No LDIF file loaded. Use the 'load' command first.{Style.RESET_ALL}")
             return
 
-        self.nodes, self.edges = parse_ldif(self.ldif_content, self.membership_attributes)
+        self.nodes, self.edges = parse_ldif(self.entries, self.membership_attributes)
         print(f"{Fore.GREEN}Parsed {len(self.nodes)} nodes and {len(self.edges)} edges. Ready for export.{Style.RESET_ALL}")
 
     def view_nodes(self):
@@ -170,57 +194,60 @@ class LDIFConsole:
             print(f"{Fore.RED}No nodes available. Run 'parse' first.{Style.RESET_ALL}")
             return
         print(f"{Fore.CYAN}Nodes:{Style.RESET_ALL}")
-        for dn, label, type in self.nodes:
-            print(f"  {Fore.BLUE}{type}: {label} ({dn}){Style.RESET_ALL}")
+        node_tmpl = self._node_tmpl
+        sys.stdout.write("\n".join([node_tmpl % (type, label, dn) for dn, label, type in self.nodes]))
+        sys.stdout.write("\n")
 
     def view_edges(self):
         if not self.edges:
             print(f"{Fore.RED}No edges available. Run 'parse' first.{Style.RESET_ALL}")
             return
         print(f"{Fore.CYAN}Edges:{Style.RESET_ALL}")
-        for source, target, relation in self.edges:
-            print(f"  {Fore.BLUE}{relation}: {source} -> {target}{Style.RESET_ALL}")
+        edge_tmpl = self._edge_tmpl
+        sys.stdout.write("\n".join([edge_tmpl % (relation, source, target) for source, target, relation in self.edges]))
+        sys.stdout.write("\n")
 
     def view_group(self, group_dn):
-        if not self.ldif_content:
+        if not self.entries:
             print(f"{Fore.RED}No LDIF file loaded. Use the 'load' command first.{Style.RESET_ALL}")
             return
 
-        group_found = False
-        current_entry = []
-        for line in self.ldif_content.splitlines():
-            line = line.strip()
-            if line.startswith("dn:"):
-                if current_entry and current_entry[0].split(":", 1)[1].strip() == group_dn:
-                    group_found = True
-                    break
-                current_entry = [line]
-            else:
-                current_entry.append(line)
-
-        if current_entry and current_entry[0].split(":", 1)[1].strip() == group_dn:
-            group_found = True
-
-        if group_found:
+        group_entry = self.dn_index.get(group_dn.strip())
+        if group_entry:
             print(f"{Fore.CYAN}Group details for {group_dn}:{Style.RESET_ALL}")
-            for line in current_entry:
-                print(f"  {Fore.MAGENTA}{line}{Style.RESET_ALL}")
+            print(f"  {Fore.MAGENTA}dn: {group_entry['dn']}{Style.RESET_ALL}")
+            for _, attr, value in group_entry["attrs"]:
+                print(f"  {Fore.MAGENTA}{attr}: {value}{Style.RESET_ALL}")
         else:
             print(f"{Fore.RED}Group '{group_dn}' not found.{Style.RESET_ALL}")
 
+    def view_group_command(self, args):
+        if args:
+            self.view_group(args)
+        else:
+            print(f"{Fore.RED}Usage: view_group <group_dn>{Style.RESET_ALL}")
+
+    def export_command(self, args):
+        if args:
+            files = args.split()
+            if len(files) == 2:
+                self.export(files[0], files[1])
+            else:
+                print(f"{Fore.RED}Usage: export <nodes_file> <edges_file>{Style.RESET_ALL}")
+        else:
+            self.export()
+
+    def exit_command(self, args):
+        print(f"{Fore.GREEN}Exiting LDAPLynx Console.{Style.RESET_ALL}")
+        return True
+
     def export(self, nodes_file="nodes.csv", edges_file="edges.csv"):
         if not self.nodes or not self.edges:
             print(f"{Fore.RED}No parsed data to export. Run 'parse' first.{Style.RESET_ALL}")
             return
 
-        with open(nodes_file, "w") as nodes_file_obj:
-            nodes_file_obj.write("Id,Label,Type\n")
-            for dn, label, type in self.nodes:
-                nodes_file_obj.write(f"\"{dn}\",\"{label}\",\"{type}\"\n")
-        with open(edges_file, "w") as edges_file_obj:
-            edges_file_obj.write("Source,Target,Relation\n")
-            for source, target, relation in self.edges:
-                edges_file_obj.write(f"\"{source}\",\"{target}\",\"{relation}\"\n")
+        write_csv(nodes_file, ("Id", "Label", "Type"), self.nodes)
+        write_csv(edges_file, ("Source", "Target", "Relation"), self.edges)
 
         print(f"{Fore.GREEN}Files saved: '{nodes_file}' and '{edges_file}'{Style.RESET_ALL}")
 
@@ -271,73 +298,176 @@ LDAPLynx Console - Type 'help' for a list of commands.
             cmd = cmd_parts[0]
             args = cmd_parts[1] if len(cmd_parts) > 1 else None
 
-            if cmd == "help":
-                self.help()
-            elif cmd == "load":
-                self.load_ldif(args)
-            elif cmd == "set_attrs":
-                self.set_membership_attributes(args)
-            elif cmd == "parse":
-                self.parse()
-            elif cmd == "view_nodes":
-                self.view_nodes()
-            elif cmd == "view_edges":
-                self.view_edges()
-            elif cmd == "view_group":
-                if args:
-                    self.view_group(args)
-                else:
-                    print(f"{Fore.RED}Usage: view_group <group_dn>{Style.RESET_ALL}")
-            elif cmd == "export":
-                if args:
-                    files = args.split()
-                    if len(files) == 2:
-                        self.export(files[0], files[1])
-                    else:
-                        print(f"{Fore.RED}Usage: export <nodes_file> <edges_file>{Style.RESET_ALL}")
-                else:
-                    self.export()
-            elif cmd == "exit":
-                print(f"{Fore.GREEN}Exiting LDAPLynx Console.{Style.RESET_ALL}")
-                break
-            else:
+            handler = self.dispatch.get(cmd)
+            if handler is None:
                 print(f"{Fore.RED}Unknown command: {cmd}. Type 'help' for a list of commands.{Style.RESET_ALL}")
+            elif handler(args):
+                break
 
-def parse_ldif(ldif_content, membership_attributes):
-    uid_to_dn = {}  # Maps user UIDs to their full DNs
-    edges = []
-    nodes = set()
-
-    current_dn = None
-    current_type = None
-    for line in ldif_content.splitlines():
-        line = line.strip()
-        if line.startswith("dn:"):
-            current_dn = line.split(":", 1)[1].strip()
-            current_type = None
-        elif line.startswith("objectClass:"):
-            if "inetOrgPerson" in line or "posixAccount" in line:
-                current_type = "User"
-            elif "groupOfNames" in line or "posixGroup" in line or "groupOfMembers" in line:
-                current_type = "Group"
-        elif line.startswith("uid:") and current_type == "User":
-            uid = line.split(":", 1)[1].strip()
-            nodes.add((current_dn, uid, current_type))
-        elif line.startswith("cn:") and current_type == "Group":
-            cn = line.split(":", 1)[1].strip()
-            nodes.add((current_dn, cn, current_type))
+def write_csv(file_path, header, rows):
+    """Write a header and rows to a fully quoted CSV file."""
+    with open(file_path, "w", buffering=1 << 20, newline="") as file_obj:
+        writer = csv.writer(file_obj, quoting=csv.QUOTE_ALL, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def complete_path(partial_path):
+    """Return the files and directories matching a partially typed path."""
+    directory, prefix = os.path.split(partial_path)
+    show_hidden = prefix.startswith(".")
+    matches = []
+
+    try:
+        with os.scandir(directory or ".") as dir_entries:
+            for dir_entry in dir_entries:
+                name = dir_entry.name
+                if not name.startswith(prefix) or (name.startswith(".") and not show_hidden):
+                    continue
+                # DirEntry.is_dir() uses the readdir type information, avoiding a stat per entry
+                suffix = "/" if dir_entry.is_dir() else ""
+                matches.append(os.path.join(directory, name) + suffix)
+    except OSError:
+        return []
+
+    return matches
+
+
+def unfold_ldif_lines(lines):
+    """Yield logical LDIF lines, joining folded continuation lines.
+
+    Per RFC 2849 a line starting with a single space continues the previous
+    line; only the line ending is stripped so folded values stay intact.
+    """
+    logical_line = None
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        if line[:1] == " " and logical_line is not None:
+            logical_line += line[1:]
+            continue
+        if logical_line is not None:
+            yield logical_line
+        logical_line = line
+
+    if logical_line is not None:
+        yield logical_line
+
+
+def decode_ldif_value(encoded_value):
+    """Decode a base64 ``attr:: value``, keeping the raw text if it is not UTF-8."""
+    try:
+        return base64.b64decode(encoded_value).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        return encoded_value
+
+
+def read_ldif_entries(lines):
+    """Tokenize LDIF lines into entries in a single pass.
+
+    Each entry is a dict with its ``dn`` and the ordered list of
+    ``(lowercased attribute, attribute, value)`` tuples that follow it. The
+    lowercased name is used for matching, the original for display.
+    """
+    entries = []
+    current_entry = None
+
+    for line in unfold_ldif_lines(lines):
+        if not line:
+            current_entry = None  # A blank line terminates the entry
+            continue
+        if line.startswith("#"):
+            continue
+
+        attr, sep, value = line.partition(":")
+        if not sep:
+            continue
+        if value.startswith(":"):
+            value = decode_ldif_value(value[1:].strip())
         else:
-            for attr in membership_attributes:
-                if line.startswith(f"{attr}:"):
-                    member_value = line.split(":", 1)[1].strip()
-                    if attr == "memberUid":
-                        member_dn = uid_to_dn.get(member_value, None)
-                    else:
-                        member_dn = member_value
-                    if member_dn:
-                        edges.append((member_dn, current_dn, "memberOf"))
-
-    return list(nodes), edges
+            value = value.strip()
+        key = attr.lower()
+        if key == "dn":
+            # DNs are repeated across nodes, edges and indexes; share one string object
+            current_entry = {"dn": sys.intern(value), "attrs": []}
+            entries.append(current_entry)
+        elif current_entry is not None:
+            current_entry["attrs"].append((key, attr, value))
+
+    return entries
+
+
+def _entry_type(attrs):
+    """Classify an entry as "User" or "Group" from all of its objectClass values."""
+    object_classes = {value.lower() for key, _, value in attrs if key == "objectclass"}
+    if not object_classes.isdisjoint(USER_OBJECT_CLASSES):
+        return "User"
+    if not object_classes.isdisjoint(GROUP_OBJECT_CLASSES):
+        return "Group"
+    return None
+
+
+def _on_uid(state, value):
+    if state["type"] == "User":
+        state["nodes"].setdefault(state["dn"], (state["dn"], value, state["type"]))
+        state["uid_to_dn"].setdefault(value, state["dn"])
+
+
+def _on_cn(state, value):
+    if state["type"] == "Group":
+        state["nodes"].setdefault(state["dn"], (state["dn"], value, state["type"]))
+
+
+def _on_member(state, value):
+    state["edges"].append((sys.intern(value), state["dn"], "memberOf"))
+
+
+def _on_member_uid(state, value):
+    # The user entry may come later in the file; resolved after all entries are read
+    state["pending_uids"].append((value, state["dn"]))
+
+
+ATTRIBUTE_HANDLERS = {
+    "uid": _on_uid,
+    "cn": _on_cn,
+}
+
+
+def parse_ldif(entries, membership_attributes):
+    state = {
+        "dn": None,
+        "type": None,
+        "nodes": {},  # Keyed by DN, keeps the first label seen in file order
+        "edges": [],
+        "uid_to_dn": {},  # Maps user UIDs to their full DNs
+        "pending_uids": [],  # (uid, group DN) pairs from memberUid values
+    }
+
+    # Build the attribute dispatch table once rather than testing every
+    # membership attribute against every line.
+    handlers = {}
+    for attr in membership_attributes:
+        attr = attr.strip().lower()
+        handlers[attr] = _on_member_uid if attr == "memberuid" else _on_member
+    handlers.update(ATTRIBUTE_HANDLERS)
+
+    for entry in entries:
+        state["dn"] = entry["dn"]
+        # Resolved up front, since uid/cn may precede objectClass in the entry
+        state["type"] = _entry_type(entry["attrs"])
+        for key, _, value in entry["attrs"]:
+            handler = handlers.get(key)
+            if handler:
+                handler(state, value)
+
+    uid_to_dn = state["uid_to_dn"]
+    state["edges"].extend(
+        (uid_to_dn[uid], group_dn, "memberOf")
+        for uid, group_dn in state["pending_uids"]
+        if uid in uid_to_dn
+    )
+
+    return list(state["nodes"].values()), state["edges"]
 
 
 if __name__ == "__main__":